@@ -1,7 +1,17 @@
+import json
+import os
+import threading
+import time
+import types
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import wbgapi as wb
 from datetime import datetime
 from json import JSONDecodeError
 
@@ -22,7 +32,7 @@ st.write(
 # --- 3. Sidebar (User Controls) ---
 st.sidebar.header("Dashboard Controls")
 
-INDICATORS_DB = {
+INDICATORS_DB = types.MappingProxyType({
     "GDP per capita (current US$)": "NY.GDP.PCAP.CD",
     "Female Literacy Rate (% ages 15+)": "SE.PRM.LITR.FE.ZS",
     "Population, total": "SP.POP.TOTL",
@@ -31,82 +41,186 @@ INDICATORS_DB = {
     "Life expectancy at birth, total (years)": "SP.DYN.LE00.IN",
     "Access to electricity (% of population)": "EG.ELC.ACCS.ZS",
     "CO2 emissions (metric tons per capita)": "EN.ATM.CO2E.PC"
-}
-indicator_names = list(INDICATORS_DB.keys())
+})
+# Read-only lookups derived once from INDICATORS_DB
+INDICATOR_NAMES = tuple(INDICATORS_DB)
+CODE_TO_NAME = types.MappingProxyType({v: k for k, v in INDICATORS_DB.items()})
+
+# On-disk cache so World Bank results survive app restarts
+CACHE_DIR = "cache"
+CACHE_MAX_AGE = 60 * 60 * 24  # seconds; refetch once a day
+COUNTRIES_MAX_AGE = 60 * 60 * 24 * 30  # the country list barely ever changes
+COUNTRIES_FILE = os.path.join(CACHE_DIR, "countries.parquet")
+COUNTRY_CODES_FILE = os.path.join(CACHE_DIR, "country_codes.json")
+
+def _cache_path(country_code, start_year, end_year, indicator_codes):
+    """Builds the Parquet file path for one country/year-range/indicator set."""
+    codes = "-".join(sorted(indicator_codes))
+    return os.path.join(
+        CACHE_DIR, f"{country_code}_{start_year}_{end_year}_{codes}.parquet"
+    )
+
+def _is_fresh(path, max_age=CACHE_MAX_AGE):
+    """True if a cache file exists and is younger than max_age seconds."""
+    return os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age
+
+WB_INDICATOR_URL = "https://api.worldbank.org/v2/country/{country}/indicator/{code}"
+
+@st.cache_resource
+def _http_client():
+    """
+    One HTTP/2 client shared by every World Bank indicator request.
+    Concurrent fetches are multiplexed as streams on the same connection.
+    """
+    return httpx.Client(
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=4)
+    )
+
+@st.cache_resource
+def _wb_session():
+    """
+    Keep-alive session for wbgapi that also retries transient 5xx errors.
+    wbgapi has no session option and calls requests.get() through its own
+    module reference, so that reference is pointed at this session.
+    """
+    import wbgapi as wb
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+    ))
+    wb.requests = session
+    return session
+
+def _fetch_indicator(client, country_code, code, start_year, end_year):
+    """Fetches one indicator for one country as a {year: value} dict."""
+    url = WB_INDICATOR_URL.format(country=country_code, code=code)
+    params = {"date": f"{start_year}:{end_year}", "format": "json", "per_page": 20000}
+    response = client.get(url, params=params)
+    response.raise_for_status()
+    payload = response.json()
+
+    # The API answers [metadata, rows]; unknown or archived indicators come
+    # back as a lone message object, which we treat as "no data"
+    if len(payload) < 2 or not payload[1]:
+        return {}
+    return {int(row['date']): row['value'] for row in payload[1]}
+
+def _fetch_indicators(country_code, indicator_codes, start_year, end_year):
+    """Fetches several indicators concurrently over the shared client."""
+    client = _http_client()
+    with ThreadPoolExecutor(max_workers=len(indicator_codes)) as pool:
+        return list(pool.map(
+            lambda code: _fetch_indicator(client, country_code, code, start_year, end_year),
+            indicator_codes
+        ))
 
 # --- Caching Functions (for performance) ---
-@st.cache_data
+# plotly and wbgapi are slow to import, so they are loaded inside the
+# functions that need them rather than at the top of the script
+@st.cache_data(ttl=COUNTRIES_MAX_AGE, show_spinner=False)
 def get_countries():
-    """Fetches and formats a list of countries and their codes from wbgapi."""
-    countries = wb.economy.list()
-    countries = [country for country in countries if country.get('region') != "Aggregates"]
-    country_names = [country['value'] for country in countries]
-    country_codes = {country['value']: country['id'] for country in countries}
+    """
+    Fetches and formats a list of countries and their codes from wbgapi.
+    The list is also saved to disk so a cold start can skip the API call.
+    """
+    if (_is_fresh(COUNTRIES_FILE, COUNTRIES_MAX_AGE)
+            and _is_fresh(COUNTRY_CODES_FILE, COUNTRIES_MAX_AGE)):
+        try:
+            with open(COUNTRY_CODES_FILE) as f:
+                country_codes = json.load(f)
+            country_names = pd.read_parquet(COUNTRIES_FILE)['value'].tolist()
+            # An empty list means a bad write; never serve it
+            if country_names and country_codes:
+                return country_names, country_codes
+        except (OSError, ValueError):
+            pass  # Unreadable cache files; fetch the list again
+
+    import wbgapi as wb
+
+    _wb_session()
+    countries = pd.DataFrame(wb.economy.list())
+    countries = countries[countries['region'] != "Aggregates"]
+    country_names = countries['value'].tolist()
+    country_codes = dict(zip(countries['value'], countries['id']))
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        countries.to_parquet(COUNTRIES_FILE, compression='zstd')
+        with open(COUNTRY_CODES_FILE, 'w') as f:
+            json.dump(country_codes, f)
+    except (OSError, ValueError):
+        pass
+
     return country_names, country_codes
 
-@st.cache_data
-def get_data(country_code, data_date_range, indicators_dict):
+CountryMeta = namedtuple('CountryMeta', ['names', 'codes', 'default_index'])
+
+@st.cache_resource(ttl=COUNTRIES_MAX_AGE)
+def _country_meta():
+    """
+    Bundles the country list, the name-to-code map and the default
+    selection (India) so reruns reuse the same objects.
+    """
+    names, codes = get_countries()
+    default_index = names.index("India") if "India" in codes else 0
+    return CountryMeta(names, codes, default_index)
+
+@st.cache_data(max_entries=64, ttl=60 * 60 * 6, show_spinner="Fetching World Bank data…")
+def _fetch_all_indicators(country_code, start_year, end_year):
     """
-    Fetches and processes data from the World Bank API.
-    This function is now robust and handles all known bugs.
+    Fetches and processes every indicator in INDICATORS_DB from the World Bank API.
+    One fetch covers all indicators, so changing the indicator dropdowns
+    only needs a column selection on the cached result.
     """
     try:
-        indicator_codes = list(indicators_dict.values())
-        
-        # Create a safe list of strings for the API
-        time_list = [str(year) for year in data_date_range]
-        
-        df_wide = wb.data.DataFrame(
-            indicator_codes,
-            country_code,
-            time=time_list
-        )
+        indicator_codes = list(INDICATORS_DB.values())
+
+        cache_file = _cache_path(country_code, start_year, end_year, indicator_codes)
+        if _is_fresh(cache_file):
+            return pd.read_parquet(cache_file), None
+
+        # One request per indicator, all in flight at the same time
+        results = _fetch_indicators(country_code, indicator_codes, start_year, end_year)
 
         # --- Data Processing Pipeline ---
-        
+
+        # One column per indicator code, aligned on year
+        df_final = pd.DataFrame({
+            code: pd.Series(values, dtype='float64')
+            for code, values in zip(indicator_codes, results)
+        })
+
         # Check for empty data before processing
-        if df_wide.empty:
+        if df_final.empty:
             return None, None
 
-        # This turns the index (economy, time) into columns
-        df_wide = df_wide.reset_index()
-
-        # Rename EXPLICITLY by name
-        rename_map = {
-            'economy': 'Country',
-            'time': 'TimeStr'  # Rename the 'time' column to 'TimeStr'
-        }
-        df_wide = df_wide.rename(columns=rename_map)
-        
-        # Drop rows where time is missing
-        df_wide = df_wide.dropna(subset=['TimeStr'])
-
-        # Safely clean the 'TimeStr' column
-        df_wide['TimeStr'] = df_wide['TimeStr'].astype(str)
-        df_wide['Year'] = df_wide['TimeStr'].str.replace('YR', '').astype(int)
-
-        # Melt from wide to long
-        df_long = df_wide.melt(
-            id_vars=['Country', 'Year'], # Use our new, clean 'Year' column
-            var_name='series',
-            value_name='Value'
-        )
-        
-        # Remove duplicates before pivoting
-        df_long = df_long.drop_duplicates(subset=['Country', 'Year', 'series'])
+        # The API lists newest years first; sorting the year index here is
+        # cheaper than sorting the whole frame by a column afterwards
+        df_final = df_final.sort_index()
 
-        # Pivot back to get indicators as columns
-        df_final = df_long.pivot(
-            index=['Country', 'Year'],
-            columns='series',
-            values='Value'
-        ).reset_index()
+        # This turns the year index into a column
+        df_final = df_final.rename_axis('Year').reset_index()
+        df_final['Year'] = df_final['Year'].astype('int16')
+        # One repeated code per row, so store it as a category
+        df_final.insert(0, 'Country', country_code)
+        df_final['Country'] = df_final['Country'].astype('category')
 
         # Rename columns to readable names
-        reverse_indicator_map = {v: k for k, v in indicators_dict.items()}
-        df_final = df_final.rename(columns=reverse_indicator_map)
-        
-        return df_final.sort_values('Year'), None  # Return data and no error
+        df_final = df_final.rename(columns=CODE_TO_NAME)
+
+        # A failed cache write should never hide data we already have
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df_final.to_parquet(cache_file, compression='zstd')
+        except OSError:
+            pass
+
+        return df_final, None  # Return data and no error
     
     except JSONDecodeError as e:
         return None, (
@@ -116,36 +230,171 @@ def get_data(country_code, data_date_range, indicators_dict):
         # Catch all other errors
         return None, str(e)
 
-# --- 4. Sidebar Widget Implementation ---
-country_names, country_codes = get_countries()
+@st.cache_resource
+def _prefetch_default_view(start_year, end_year):
+    """
+    Warms the data cache for the default view (India) in a background
+    thread, once per process, so the first page load finds it ready.
+    """
+    thread = threading.Thread(
+        target=_fetch_all_indicators,
+        args=("IND", start_year, end_year),
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+def get_data(country_code, start_year, end_year, indicator_indices):
+    """
+    Returns the Country, Year and requested indicator columns (given as
+    positions in INDICATOR_NAMES) for one country and year range, sliced
+    from the cached all-indicator fetch.
+    Rows where none of the requested indicators have a value are dropped.
+    """
+    all_data, error = _fetch_all_indicators(country_code, start_year, end_year)
+    if all_data is None:
+        return None, error
+
+    # dict.fromkeys drops a duplicate when the same indicator is picked twice
+    indicator_names = list(dict.fromkeys(INDICATOR_NAMES[i] for i in indicator_indices))
+    data = all_data[['Country', 'Year', *indicator_names]]
+    return data.dropna(subset=indicator_names, how='all'), None
+
+# Longer series are downsampled before plotting so the figure payload stays bounded
+MAX_TREND_POINTS = 500
+
+def _lttb(x, y, n_out):
+    """
+    Downsamples (x, y) to n_out points with Largest-Triangle-Three-Buckets.
+    Keeps the first and last points and, from each bucket in between, the
+    point that best preserves the visual shape of the line.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    xf = np.asarray(x, dtype='float64')
+    yf = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # The third triangle vertex is the average of the next bucket
+        # (just the last point for the final bucket)
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = xf[next_lo:next_hi].mean()
+        avg_y = yf[next_lo:next_hi].mean()
+        area = np.abs(
+            (xf[prev] - avg_x) * (yf[lo:hi] - yf[prev])
+            - (xf[prev] - xf[lo:hi]) * (avg_y - yf[prev])
+        )
+        prev = lo + int(area.argmax())
+        keep[i + 1] = prev
 
+    return x[keep], y[keep]
+
+# Figures are cached too, so reruns that keep the same data (e.g. opening
+# the raw data table) skip rebuilding them and refitting the trendline
+@st.cache_data(max_entries=128, show_spinner=False)
+def build_trend_figure(data, indicator_1_name, indicator_2_name):
+    """Builds the side-by-side trend chart for the two selected indicators."""
+    from plotly.subplots import make_subplots
+
+    # Both trends in one figure: a single payload and one render call
+    trend_fig = make_subplots(
+        rows=1,
+        cols=2,
+        subplot_titles=(f"{indicator_1_name} Over Time", f"{indicator_2_name} Over Time")
+    )
+    years = data['Year'].to_numpy()
+    for col, indicator_name in enumerate((indicator_1_name, indicator_2_name), start=1):
+        xs, ys = years, data[indicator_name].to_numpy()
+        if len(xs) > MAX_TREND_POINTS:
+            present = ~np.isnan(ys)
+            xs, ys = _lttb(xs[present], ys[present], MAX_TREND_POINTS)
+        trend_fig.add_scatter(
+            x=xs,
+            y=ys,
+            mode='lines',
+            name=indicator_name,
+            row=1,
+            col=col
+        )
+        trend_fig.update_xaxes(title_text='Year', row=1, col=col)
+        trend_fig.update_yaxes(title_text=indicator_name, row=1, col=col)
+    trend_fig.update_layout(showlegend=False)
+    return trend_fig
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def build_correlation_figure(x, y, years, indicator_1_name, indicator_2_name):
+    """
+    Builds the correlation scatter plot with its OLS trendline from
+    NaN-free x/y value arrays and their matching years.
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    fig = px.scatter(
+        x=x,
+        y=y,
+        labels={'x': indicator_1_name, 'y': indicator_2_name},
+        title=f"Correlation Plot",
+        hover_data={'Year': years}, # Show the year on hover
+        render_mode='webgl'
+    )
+    # WebGL markers draw a little smaller than SVG ones by default
+    fig.update_traces(marker=dict(size=6))
+
+    # A one-variable least-squares line is just a degree-1 polyfit, so
+    # there is no need to pull in statsmodels for it
+    if len(x) >= 2 and x.min() != x.max():
+        slope, intercept = np.polyfit(x, y, 1)
+        x_ends = np.array([x.min(), x.max()])
+        fig.add_trace(go.Scatter(
+            x=x_ends,
+            y=slope * x_ends + intercept,
+            mode='lines',
+            name='OLS trendline',
+            showlegend=False
+        ))
+    return fig
+
+# --- 4. Sidebar Widget Implementation ---
 # --- THIS IS THE FIX (Line 128 approx) ---
 # I wrote 'current_.year' before. It is now 'current_year'.
 current_year = datetime.now().year
 # --- END FIX ---
 
-try:
-    default_country_index = country_names.index("India")
-except ValueError:
-    default_country_index = 0
-    
+# Start loading the landing view's data while the country list loads
+_prefetch_default_view(2000, current_year - 1)
+
+country_names, country_codes, default_country_index = _country_meta()
+
 selected_country_name = st.sidebar.selectbox(
     "Select a Country",
     country_names,
     index=default_country_index
 )
 
-indicator_1_name = st.sidebar.selectbox(
+# The indicator boxes return positions in INDICATOR_NAMES, shown by name
+indicator_1_idx = st.sidebar.selectbox(
     "Select Indicator 1 (Trend 1 & Correlation X-axis)",
-    indicator_names,
-    index=0
+    range(len(INDICATOR_NAMES)),
+    index=0,
+    format_func=INDICATOR_NAMES.__getitem__
 )
 
-indicator_2_name = st.sidebar.selectbox(
+indicator_2_idx = st.sidebar.selectbox(
     "Select Indicator 2 (Trend 2 & Correlation Y-axis)",
-    indicator_names,
-    index=1
+    range(len(INDICATOR_NAMES)),
+    index=1,
+    format_func=INDICATOR_NAMES.__getitem__
 )
+indicator_1_name = INDICATOR_NAMES[indicator_1_idx]
+indicator_2_name = INDICATOR_NAMES[indicator_2_idx]
 
 start_year, end_year = st.sidebar.slider(
     "Select Year Range",
@@ -161,16 +410,8 @@ if selected_country_name not in country_codes:
 
 country_code = country_codes[selected_country_name]
 
-indicators_to_fetch = {
-    indicator_1_name: INDICATORS_DB[indicator_1_name],
-    indicator_2_name: INDICATORS_DB[indicator_2_name]
-}
-
-# We create the safe range() object to pass to our function
-data_date_range = range(start_year, end_year + 1)
-
 # Call our robust data fetching function
-data, error = get_data(country_code, data_date_range, indicators_to_fetch)
+data, error = get_data(country_code, start_year, end_year, (indicator_1_idx, indicator_2_idx))
 
 # --- 6. Main Page Display (Charts and Data) ---
 if error:
@@ -183,41 +424,22 @@ elif data is None or data.empty:
 else:
     st.header(f"Analysis for {selected_country_name} ({start_year} - {end_year})")
 
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader(f"Trend: {indicator_1_name}")
-        fig1 = px.line(
-            data,
-            x='Year',
-            y=indicator_1_name,
-            title=f"{indicator_1_name} Over Time"
-        )
-        st.plotly_chart(fig1, use_container_width=True)
-
-    with col2:
-        st.subheader(f"Trend: {indicator_2_name}")
-        fig2 = px.line(
-            data,
-            x='Year',
-            y=indicator_2_name,
-            title=f"{indicator_2_name} Over Time"
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-        
+    trend_fig = build_trend_figure(data, indicator_1_name, indicator_2_name)
+    st.plotly_chart(trend_fig, use_container_width=True)
+
     st.header("Correlation Analysis")
     st.write(f"Is there a link between '{indicator_1_name}' and '{indicator_2_name}'?")
     
-    corr_data = data[[indicator_1_name, indicator_2_name]].dropna()
+    # Only rows with both values can be plotted or fitted
+    both_present = data[indicator_1_name].notna() & data[indicator_2_name].notna()
     
-    if not corr_data.empty:
-        fig3 = px.scatter(
-            data,
-            x=indicator_1_name,
-            y=indicator_2_name,
-            title=f"Correlation Plot",
-            trendline="ols",
-            hover_data=['Year'] # Show the year on hover
+    if both_present.any():
+        fig3 = build_correlation_figure(
+            data.loc[both_present, indicator_1_name].to_numpy(),
+            data.loc[both_present, indicator_2_name].to_numpy(),
+            data.loc[both_present, 'Year'].to_numpy(),
+            indicator_1_name,
+            indicator_2_name
         )
         st.plotly_chart(fig3, use_container_width=True)
     else: